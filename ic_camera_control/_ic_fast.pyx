@@ -0,0 +1,53 @@
+# cython: language_level=3
+""" read()ホットパス用の小さなCython拡張（任意ビルド）
+
+ctypesでロード済みのtisgrabber_x64.dllから関数アドレスをinit()で受け取り、
+以後のフレーム取得をctypesのマーシャリングなしで行う。SDK呼び出し中はGILを
+解放するので、他スレッドの処理と完全にオーバーラップできる。
+Cythonが入っていない環境ではビルドされず、従来のctypes経路のみになる。
+"""
+from libc.string cimport memcpy
+
+ctypedef int (*snap_func)(void*, int) nogil
+ctypedef void* (*get_ptr_func)(void*) nogil
+
+cdef snap_func _snap = NULL
+cdef get_ptr_func _get_ptr = NULL
+
+
+def init(size_t snap_addr, size_t get_ptr_addr):
+    """ ctypesで解決したIC_SnapImage / IC_GetImagePtrのアドレスを登録する
+
+    Args:
+        snap_addr (int): IC_SnapImageの関数アドレス
+        get_ptr_addr (int): IC_GetImagePtrの関数アドレス
+    """
+    global _snap, _get_ptr
+    _snap = <snap_func><void*>snap_addr
+    _get_ptr = <get_ptr_func><void*>get_ptr_addr
+
+
+def snap_into(size_t hgrabber, unsigned char[:, :, ::1] out, int timeout_ms=1000):
+    """ IC_SnapImageを呼び、結果をoutへ直接memcpyする
+
+    Args:
+        hgrabber (int): グラバーハンドルのアドレス
+        out (np.ndarray): C連続のuint8 3次元配列（書き込み先）
+        timeout_ms (int): IC_SnapImageのタイムアウト（ミリ秒）
+
+    Returns:
+        bool: フレームを取得してコピーできたか
+    """
+    cdef void* hg = <void*>hgrabber
+    cdef void* src = NULL
+    cdef int ret
+    cdef size_t nbytes = out.shape[0] * out.shape[1] * out.shape[2]
+    if _snap is NULL or _get_ptr is NULL:
+        raise RuntimeError("init() has not been called")
+    with nogil:
+        ret = _snap(hg, timeout_ms)
+        if ret == 1:  # IC_SUCCESS
+            src = _get_ptr(hg)
+            if src != NULL:
+                memcpy(&out[0, 0, 0], src, nbytes)
+    return ret == 1 and src != NULL
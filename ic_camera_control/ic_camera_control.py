@@ -1,11 +1,19 @@
 import os
 import ctypes
+import functools
 import logging
+import queue
 import threading
+import time
 
 import cv2
 import numpy as np
 
+try:
+    import numba
+except ImportError:  # numbaは任意依存。無くても純NumPyパスで動く
+    numba = None
+
 from . import tisgrabber as tis
 
 # ライブラリのルートロガーを作成
@@ -28,34 +36,156 @@ def configure_logging(level=logging.WARNING, handler=None):
     logger.setLevel(level)
 
 
-class CallbackUserdata(ctypes.Structure):
-    """  コールバック関数に渡されるユーザーデータの例 """
+@functools.lru_cache(maxsize=32)
+def _T(instr):
+    """ tis.T() のキャッシュ版
+
+    設定ファイルの切り替えなど同じ文字列を繰り返し渡す用途向けに、
+    utf-8エンコード結果をキャッシュする。
+    """
+    return tis.T(instr)
+
+
+def make_gain_gamma_post_process(gain=1.0, gamma=1.0):
+    """ ゲイン・ガンマ補正をひとまとめにした後処理関数を作る関数
+
+    IcCameraControlのpost_process引数に渡す用。numbaが入っていれば行単位で並列化した
+    機械語カーネルを返す（cache=Trueで2回目以降のコンパイルはほぼ一瞬）。
+    無ければNumPyのLUT参照によるフォールバックを返す。
+
+    Args:
+        gain (float): ゲイン
+        gamma (float): ガンマ値
+
+    Returns:
+        callable: 画像を受け取り補正後の画像を返す関数
+    """
+    lut = np.clip(((np.arange(256) / 255.0) ** gamma) * gain * 255.0, 0, 255).astype(np.uint8)
+
+    if numba is None:
+        return lambda frame: lut[frame]
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _kernel(frame, out):
+        for y in numba.prange(frame.shape[0]):
+            for x in range(frame.shape[1]):
+                for c in range(frame.shape[2]):
+                    out[y, x, c] = lut[frame[y, x, c]]
+
+    out_buf = [None]  # 出力用の使い回しバッファ
+
+    def _apply(frame):
+        # 入力はリングバッファのビューのことがあるので書き換えず、専用の出力バッファへ書く
+        if out_buf[0] is None or out_buf[0].shape != frame.shape:
+            out_buf[0] = np.empty(frame.shape, np.uint8)
+        _kernel(frame, out_buf[0])
+        return out_buf[0]
+
+    return _apply
+
+
+def _make_native_frame_callback(ring, counter):
+    """ フレームコールバックをnumba.cfuncで機械語にコンパイルする関数
+
+    SDKスレッドがPythonインタープリター（とGIL）を経由せずにリングバッファへ
+    コピーできるようになる。ringとcounterのアドレスはコンパイル時に焼き込まれる。
+    クロージャーで掴んだndarrayはnumba内で読み取り専用の定数になってしまうので、
+    アドレスからcarrayで書き込み可能なビューを作り直す。
+
+    Args:
+        ring (np.ndarray): (スロット数, 高さ, 幅, チャンネル) のリングバッファ
+        counter (np.ndarray): 書き込み済みフレーム数 (int64, 要素数1)
+
+    Returns:
+        numbaのcfuncオブジェクト (.addressをFRAMEREADYCALLBACKに渡す)
+    """
+    from numba.extending import intrinsic
+
+    @intrinsic
+    def _as_void_pointer(typingctx, addr):
+        """ 整数アドレスをvoidポインターへ変換する（nopython内専用） """
+        sig = numba.types.voidptr(addr)
+
+        def codegen(context, builder, signature, args):
+            return builder.inttoptr(args[0], context.get_value_type(signature.return_type))
+
+        return sig, codegen
+
+    n_slots, height, width, channel = ring.shape
+    ring_addr = ring.ctypes.data
+    counter_addr = counter.ctypes.data
+    sig = numba.types.void(numba.types.voidptr,
+                           numba.types.CPointer(numba.types.uint8),
+                           numba.types.uint32,
+                           numba.types.voidptr)
+
+    @numba.cfunc(sig, nopython=True)
+    def _callback(hGrabber, pBuffer, framenumber, pData):
+        ring_ = numba.carray(_as_void_pointer(ring_addr), (n_slots, height, width, channel), np.uint8)
+        counter_ = numba.carray(_as_void_pointer(counter_addr), (1,), np.int64)
+        src = numba.carray(pBuffer, (height, width, channel), np.uint8)
+        ring_[counter_[0] % n_slots] = src
+        counter_[0] += 1
+
+    return _callback
+
+
+class CallbackUserdata:
+    """ コールバック関数に渡されるユーザーデータ
+
+    py_objectとしてSDKへ渡すだけなのでctypes.Structureである必要はない。
+    SDKスレッドから触るのはdisconnectedイベント（set()のみ）とリングバッファに留める。
+    """
+    FRAME_QUEUE_SIZE = 2  # キューに溜めるスロット番号の最大数
+
     def __init__(self, ):
-        self.unsused = ""
         self.devicename = ""
-        self.connected = False
+        self.disconnected = threading.Event()  # 切断時にSDKスレッドがsetする
+        self.disconnected.set()  # 接続が成立するまでは切断扱い
+        self.frames = None  # フレーム書き込み先のリングバッファ（解像度取得後に割り当てる）
+        self.frame_queue = queue.Queue(maxsize=self.FRAME_QUEUE_SIZE)  # 書き込み済みスロット番号のキュー
+        self.buffer_size = 0  # 1フレームのバイト数
+        self.next_slot = 0  # 次に書き込むスロット番号
+
+    @property
+    def connected(self):
+        """ カメラが接続中かどうか """
+        return not self.disconnected.is_set()
 
 
 class IcCameraControl:
-    def __init__(self, config_file_path="", IC_MsgBox_show=True, dll_path="./tisgrabber_x64.dll"):
+    def __init__(self, config_file_path="", IC_MsgBox_show=True, dll_path="./tisgrabber_x64.dll",
+                 post_process=None, buffer_count=4):
         """ 単体カメラを表示するクラス
 
         Args:
             config_file_path(str): カメラのコンフィグファイルの場所
             dll_path(str): tisgrabber_x64.dllの場所
+            post_process(callable): read()内で画像に適用する後処理関数 (省略時は何もしない)
+                make_gain_gamma_post_process()で作った関数などを渡す
+            buffer_count(int): リングバッファのスロット数 (高FPSなら3〜5推奨)
         """
+        self._post_process = post_process
+        # キューに溜まっているスロットと読み出し中のスロットを次の書き込みが
+        # 上書きしないよう、キュー容量+2を下限にする
+        self._buffer_count = max(CallbackUserdata.FRAME_QUEUE_SIZE + 2, buffer_count)
+        self._frame_counter = None  # ネイティブコールバック使用時の書き込み済みフレーム数
+        self._batch = None  # read_batch()用のバッチバッファ（初回呼び出し時に確保）
+        self._ic_fast_ready = False  # _ic_fast拡張へ関数アドレスを渡したか
         self._width = ctypes.c_long()  # 画像の幅
         self._height = ctypes.c_long()  # 画像の高さ
         self._bits_per_pixel = ctypes.c_int()  # ビット深度
         self._color_format = ctypes.c_int()  # カラーフォーマット
         self._channel = 0  # チャンネル数
-        self._buffer_size = 0  # バッファサイズ
+        self._shape = None  # (高さ, 幅, チャンネル) のタプル
+        self._nbytes = 0  # 1フレームのバイト数
 
         # tisgrabber_x64.dllをインポート
-        main_dir = os.path.dirname(os.path.abspath("__main__"))
-        os.chdir(os.path.dirname(os.path.abspath(__file__)))
-        self.ic = ctypes.cdll.LoadLibrary(dll_path)
-        os.chdir(main_dir)
+        # os.chdir()はプロセス全体に影響する（スレッドセーフでない）ので、絶対パスでロードする
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        if hasattr(os, "add_dll_directory"):  # 依存DLL(TIS_UDSHL11_x64.dll)の解決用
+            os.add_dll_directory(package_dir)
+        self.ic = ctypes.CDLL(os.path.join(package_dir, dll_path))
         tis.declareFunctions(self.ic)
 
         # ICImagingControlクラスライブラリを初期化
@@ -69,26 +199,53 @@ class IcCameraControl:
         self.userdata = CallbackUserdata()
         self.deviceLostCallbackFunc = self.ic.DEVICELOSTCALLBACK(self._deviceLostCallback)
 
+        # UI系の呼び出しを引き受ける常駐ワーカースレッドを起動
+        self._ui_queue = queue.Queue()
+        self._ui_worker = threading.Thread(target=self._ui_worker_loop, daemon=True)
+        self._ui_worker.start()
+
         # 新しいグラバーハンドルを作成
         self._hGrabber = self.ic.IC_CreateGrabber()
 
         # デバイスを開く
-        self.open_device(config_file_path)
-
-        # 取得した画像をそのままnumpy配列に変換するとなぜか上下反転するので、反転させるフィルターを有効化しておく
-        self._flip_image()
-
-        # 取得開始
-        self._start()
+        if self.open_device(config_file_path):
+            # 取得開始
+            self._start()
 
-        # 画像の解像度・フォーマットを取得
-        self._get_image_description()
+            # 画像の解像度・フォーマットを取得
+            self._get_image_description()
+        else:
+            # デバイスが開けなかったときはタイムアウトを待たず、即時にフレームなしを返す
+            self._frames = None
+            self._next_frame = lambda timeout: None
 
     @staticmethod
     def _frameReadyCallback(hGrabber, pBuffer, framenumber, pData):
-        # コールバック関数処理
-        # 省略
-        return
+        """ フレームが届くたびにSDKスレッドから呼ばれるコールバック
+
+        SDKバッファをリングバッファの次のスロットへコピーし、スロット番号をキューに積む。
+        キューが満杯の場合は最も古いフレームを捨てて積み直す（最新フレーム優先）。
+
+        Args:
+            hGrabber: グラバーオブジェクトへの実際のポインター（使用禁止）
+            pBuffer: フレームデータの先頭ポインター
+            framenumber: ストリーム開始からのフレーム番号
+            pData: ユーザーデータ構造へのポインター
+        """
+        frames = pData.frames
+        if frames is None:  # 解像度取得前に届いたフレームは捨てる
+            return
+        idx = pData.next_slot
+        ctypes.memmove(frames[idx].ctypes.data, pBuffer, pData.buffer_size)
+        pData.next_slot = (idx + 1) % len(frames)
+        try:
+            pData.frame_queue.put_nowait(idx)
+        except queue.Full:  # 消費が追いついていなければ古い方を捨てる
+            try:
+                pData.frame_queue.get_nowait()
+            except queue.Empty:
+                pass
+            pData.frame_queue.put_nowait(idx)
 
     @staticmethod
     def _deviceLostCallback(hGrabber, userdata):
@@ -99,34 +256,165 @@ class IcCameraControl:
             hGrabber: これはグラバーオブジェクトへの実際のポインターです。（使用禁止）
             userdata: ユーザーデータ構造へのポインター
         """
-        userdata.connected = False
+        userdata.disconnected.set()  # Event.set()はほぼアトミックでSDKスレッドをすぐ返せる
         logger.error(f"Device {userdata.devicename} lost")
 
     @staticmethod
     def _handle_device_open_error():
         logger.info("No device opened")
 
-    def read(self):
+    def read(self, timeout=5.0):
         """ 画像の取得
 
+        コールバックが積んだフレームをキューから取り出す。IC_SnapImageのポーリングと違い、
+        呼び出しスレッドをSDK側でブロックせず、取得と後処理をオーバーラップできる。
+
+        Args:
+            timeout (float): フレーム到着を待つ秒数
+
         Returns:
             (bool, img or None): (画像を取得できたかどうか, 3ch画像)
 
         """
-        if self.ic.IC_SnapImage(self._hGrabber, -1) == tis.IC_SUCCESS:
-            image_ptr = self.ic.IC_GetImagePtr(self._hGrabber)
-            if image_ptr is not None:
-                image_data = ctypes.cast(image_ptr, ctypes.POINTER(ctypes.c_ubyte * self._buffer_size))
-                img_array = np.ndarray(buffer=image_data.contents, dtype=np.uint8,
-                                       shape=(self._height.value, self._width.value, self._channel))
-                return self.userdata.connected, img_array
-            else:
-                logger.warning("No device found.")
-        else:
+        idx = self._next_frame(timeout)
+        if idx is None:
             return self.userdata.connected, None
+        # SDKのバッファは上下反転で届くので、ストライドを負にしたビューで反転する（コピーなし）
+        frame = self._convert_format(self._frames[idx][::-1])
+        if self._post_process is not None:
+            frame = self._post_process(frame)
+        return self.userdata.connected, frame
+
+    def read_batch(self, n, timeout=5.0):
+        """ nフレームまとめて取得する
+
+        1フレームごとのPython側の固定コストを償却し、後段でバッチ単位の
+        ベクトル化処理ができるようにする。各フレームにはread()と同じ
+        フォーマット変換を適用する。後処理(post_process)は適用しない。
+
+        Args:
+            n (int): 取得するフレーム数
+            timeout (float): 1フレームあたりの待ち秒数
+
+        Returns:
+            (bool, imgs or None): (全フレーム取得できたか, (n, 高さ, 幅, チャンネル)の画像群)
+
+        """
+        for i in range(n):
+            idx = self._next_frame(timeout)
+            if idx is None:
+                return self.userdata.connected, None
+            frame = self._convert_format(self._frames[idx][::-1])
+            if self._batch is None or self._batch.shape != (n,) + frame.shape:
+                self._batch = np.empty((n,) + frame.shape, frame.dtype)
+            np.copyto(self._batch[i], frame)
+        return self.userdata.connected, self._batch
+
+    def _convert_format(self, frame):
+        """ カラーフォーマットに応じた変換を行う
+
+        変換は全てOpenCV（内部でSSE/AVX/NEON実装）かNumPyのビュー変換で行い、
+        Pythonレベルのスカラーループは使わない。
+
+        Args:
+            frame (np.ndarray): 変換前の画像
+
+        Returns:
+            np.ndarray: BGR24はそのまま、RGB32はBGRの3ch、Y16はuint16の1ch、Y800はそのまま
+        """
+        fmt = self._color_format.value
+        if fmt == tis.SinkFormats.RGB32.value:
+            return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        if fmt == tis.SinkFormats.Y16.value:
+            return frame.view(np.uint16)
+        return frame  # RGB24 / Y800 は変換不要
+
+    def read_bytes(self, timeout=5.0):
+        """ 画像を生のbytesとして取得する
+
+        ffmpegパイプやgRPCなど、NumPyを介さずフレームを渡したい用途向け。
+        ctypes.string_atはネイティブのmemcpy1回で所有権のあるbytesを作るので、
+        SDKバッファの寿命を気にせず使える。
+
+        Args:
+            timeout (float): フレーム到着を待つ秒数
+
+        Returns:
+            bytes or None: 生ピクセルデータ（上下反転・フォーマット変換は行わない）
+
+        """
+        idx = self._next_frame(timeout)
+        if idx is None:
+            return None
+        return ctypes.string_at(self._frames[idx].ctypes.data, self._nbytes)
+
+    def snap_into(self, out, timeout_ms=1000):
+        """ Cython拡張経由でフレームを取得し、outへ直接コピーする
+
+        ctypesのマーシャリングを完全に迂回するread()の代替。SDK呼び出し中は
+        GILも解放される。_ic_fast拡張がビルドされている場合のみ使える。
+
+        IC_SnapImageはスナップモード専用のAPIなので、初回呼び出し時にライブを
+        一旦止めてコールバック連続モードから切り替える。以後コールバック配信は
+        行われないため、read()/read_bytes()/read_batch()とは併用できない。
+        コピーされるフレームはread_bytes()と同じく上下反転前・フォーマット変換前の
+        生データ（read()は反転・変換済みを返す）。
+
+        Args:
+            out (np.ndarray): C連続のuint8 3次元配列（書き込み先）
+            timeout_ms (int): フレーム取得のタイムアウト（ミリ秒）
+
+        Returns:
+            bool: フレームを取得してコピーできたか
+
+        """
+        from . import _ic_fast
+        if not self._ic_fast_ready:
+            _ic_fast.init(ctypes.cast(self.ic.IC_SnapImage, ctypes.c_void_p).value,
+                          ctypes.cast(self.ic.IC_GetImagePtr, ctypes.c_void_p).value)
+            # コールバック連続モードのままではIC_SnapImageが失敗するので、スナップモードへ切り替える
+            self.ic.IC_StopLive(self._hGrabber)
+            self.ic.IC_SetContinuousMode(self._hGrabber, 1)
+            self._start()
+            self._ic_fast_ready = True
+        return _ic_fast.snap_into(ctypes.cast(self._hGrabber, ctypes.c_void_p).value, out, timeout_ms)
+
+    def _specialize_read(self):
+        """ 解像度の確定後、定数を焼き込んだ_next_frame実装を生成する
+
+        スロット数・カウンター・キューをクロージャーに束縛し、フレームごとの
+        属性参照（self._frames等）とctypesフィールド参照をなくす。
+        """
+        n_slots = len(self._frames)
+        counter = self._frame_counter
+        frame_queue = self.userdata.frame_queue
+
+        if counter is not None:
+            # ネイティブコールバック使用時はカウンターの前進を待つ
+            last_count = [0]
+
+            def _next_frame(timeout):
+                deadline = time.monotonic() + timeout
+                while counter[0] == last_count[0]:
+                    if time.monotonic() >= deadline:
+                        logger.warning("No frame received.")
+                        return None
+                    time.sleep(0.001)
+                last_count[0] = int(counter[0])
+                return (last_count[0] - 1) % n_slots
+        else:
+            def _next_frame(timeout):
+                try:
+                    return frame_queue.get(timeout=timeout)
+                except queue.Empty:
+                    logger.warning("No frame received.")
+                    return None
+
+        self._next_frame = _next_frame
 
     def release(self):
         """ 終了処理 """
+        self._ui_queue.put((None, ()))
         if self.ic.IC_IsDevValid(self._hGrabber):
             self.ic.IC_StopLive(self._hGrabber)
             self.ic.IC_ReleaseGrabber(self._hGrabber)
@@ -138,7 +426,7 @@ class IcCameraControl:
             file_path (str): ***.xml 保存する場所
 
         """
-        self.ic.IC_SaveDeviceStateToFile(self._hGrabber, tis.T(file_path))
+        self.ic.IC_SaveDeviceStateToFile(self._hGrabber, _T(file_path))
 
     def open_device(self, config_file_path):
         """ デバイスを開く
@@ -153,10 +441,12 @@ class IcCameraControl:
         """
         self.load_properties(config_file_path, should_open_device=True)
 
-        if not self.ic.IC_IsDevValid(self._hGrabber):  # 設定ファイルが存在しない場合にカメラを開く
+        valid = bool(self.ic.IC_IsDevValid(self._hGrabber))
+        if not valid:  # 設定ファイルが存在しない場合にカメラを開く
             self._hGrabber = self._select_device()
+            valid = bool(self.ic.IC_IsDevValid(self._hGrabber))
 
-        if self.ic.IC_IsDevValid(self._hGrabber):
+        if valid:
             self._setup_device()
             logger.info(f"Device {self.userdata.devicename} open")
             return True
@@ -174,7 +464,7 @@ class IcCameraControl:
             should_open_device (bool): OpenDeviceが 1 or 0
 
         """
-        ret = self.ic.IC_LoadDeviceStateFromFileEx(self._hGrabber, tis.T(config_file_path), should_open_device)
+        ret = self.ic.IC_LoadDeviceStateFromFileEx(self._hGrabber, _T(config_file_path), should_open_device)
         # 設定ファイルが存在しない場合、デバイスがない場合、xmlの形式が間違っている場合
         if ret == tis.IC_FILE_NOT_FOUND or ret == tis.IC_DEVICE_NOT_FOUND or ret == tis.IC_WRONG_XML_FORMAT or \
                 ret == tis.IC_WRONG_INCOMPATIBLE_XML:
@@ -182,8 +472,21 @@ class IcCameraControl:
 
     def show_property_dialog(self):
         """ 設定変更ウィンドウを表示 """
-        dialog_thread = threading.Thread(target=self.ic.IC_ShowPropertyDialog, args=(self._hGrabber,))
-        dialog_thread.start()
+        self._ui_queue.put((self.ic.IC_ShowPropertyDialog, (self._hGrabber,)))
+
+    def _ui_worker_loop(self):
+        """ UI系の重い呼び出しを順番に処理する常駐ワーカー
+
+        キー入力のたびにスレッドを立ち上げ直さずに済むよう、1本のデーモンスレッドを使い回す。
+        """
+        while True:
+            func, args = self._ui_queue.get()
+            if func is None:  # release()からの終了指示
+                break
+            try:
+                func(*args)
+            except Exception:
+                logger.exception("UI worker command failed")
 
     def list_available_properties(self):
         """設定可能な項目一覧を表示。なぜかライブ中だと表示できない。"""
@@ -202,21 +505,13 @@ class IcCameraControl:
     def _setup_device(self):
         """ デバイスの設定 """
         self.userdata.devicename = self.ic.IC_GetDeviceName(self._hGrabber).decode('utf-8', 'ignore')
-        self.userdata.connected = True
+        self.userdata.disconnected.clear()
 
         self.ic.IC_SetCallbacks(self._hGrabber,
-                                self.frameReadyCallbackFunc, None,
+                                self.frameReadyCallbackFunc, self.userdata,
                                 self.deviceLostCallbackFunc, self.userdata)
-
-    def _flip_image(self):
-        """ 画像を反転させる
-
-        取得した画像をnumpy配列に変換するとなぜか上下反転されてるので、反転フィルターを事前に加える
-        """
-        _filter = tis.HFRAMEFILTER()
-        self.ic.IC_CreateFrameFilter(tis.T("Rotate Flip"), _filter)
-        self.ic.IC_AddFrameFilterToDevice(self._hGrabber, _filter)
-        self.ic.IC_FrameFilterSetParameterBoolean(_filter, tis.T("Flip V"), 1)
+        # 全フレームでフレームコールバックを呼んでもらうため連続モードにする
+        self.ic.IC_SetContinuousMode(self._hGrabber, 0)
 
     def _start(self, create_window=False):
         """ 画像の取得の開始
@@ -228,10 +523,48 @@ class IcCameraControl:
 
     def _get_image_description(self):
         """ 画像の解像度・フォーマットを取得する """
+        # byref()はPOINTERオブジェクトを丸ごと作らない分、暗黙のポインター変換より軽い
         self.ic.IC_GetImageDescription(self._hGrabber,
-                                       self._width, self._height, self._bits_per_pixel, self._color_format)
-        self._channel = int(self._bits_per_pixel.value / 8.0)
-        self._buffer_size = self._width.value * self._height.value * self._bits_per_pixel.value
+                                       ctypes.byref(self._width), ctypes.byref(self._height),
+                                       ctypes.byref(self._bits_per_pixel), ctypes.byref(self._color_format))
+        self._channel = self._bits_per_pixel.value // 8
+        # ctypesの.valueはアクセスのたびにC→Python変換が走るので、素のintにまとめて持っておく
+        self._shape = (self._height.value, self._width.value, self._channel)
+        self._nbytes = self._shape[0] * self._shape[1] * self._shape[2]
+        # コールバックがフレームNを書いている間にフレームN-1を読めるよう、
+        # リングバッファを事前確保してコールバック側へ渡す
+        self._frames = np.empty((self._buffer_count,) + self._shape, np.uint8)
+        self.userdata.buffer_size = self._nbytes
+        self.userdata.frames = self._frames
+
+        if numba is not None:
+            # 解像度が確定したので、Pythonを経由しないネイティブコールバックへ差し替える。
+            # 任意の高速化がクラスを壊さないよう、コンパイルに失敗したらPythonコールバックのまま使う
+            try:
+                counter = np.zeros(1, np.int64)
+                native_callback = _make_native_frame_callback(self._frames, counter)
+                callback_func = self.ic.FRAMEREADYCALLBACK(native_callback.address)
+            except Exception:
+                logger.warning("Could not compile the native frame callback", exc_info=True)
+            else:
+                # コールバック登録はライブ開始前に行う必要があるので、一旦止めてから差し替える
+                self.ic.IC_StopLive(self._hGrabber)
+                self._frame_counter = counter
+                self._native_callback = native_callback  # GC防止のため参照を保持
+                self.frameReadyCallbackFunc = callback_func
+                self.ic.IC_SetCallbacks(self._hGrabber,
+                                        self.frameReadyCallbackFunc, self.userdata,
+                                        self.deviceLostCallbackFunc, self.userdata)
+                self._start()
+                # 差し替え前にPythonコールバックが積んだスロット番号は破棄する
+                while True:
+                    try:
+                        self.userdata.frame_queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+        # 解像度・スロット数が確定したので、ホットパスを特殊化する
+        self._specialize_read()
 
     @property
     def width(self):
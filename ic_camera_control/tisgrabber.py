@@ -152,6 +152,41 @@ def declareFunctions(ic):
 
     ic.IC_CreateFrameFilter.argtypes = (ctypes.c_char_p, ctypes.POINTER(HFRAMEFILTER))
 
+    # Blocking calls need explicit prototypes so ctypes takes its fast
+    # path and other threads can run while the call is in native code
+    ic.IC_SnapImage.argtypes = (ctypes.POINTER(HGRABBER), ctypes.c_int)
+    ic.IC_SnapImage.restype = ctypes.c_int
+    ic.IC_StartLive.argtypes = (ctypes.POINTER(HGRABBER), ctypes.c_int)
+    ic.IC_StartLive.restype = ctypes.c_int
+    ic.IC_StopLive.argtypes = (ctypes.POINTER(HGRABBER),)
+    ic.IC_ShowPropertyDialog.argtypes = (ctypes.POINTER(HGRABBER),)
+    ic.IC_ShowPropertyDialog.restype = ctypes.c_int
+
+    # argtypes to skip ctypes' per-call argument type inference
+    ic.IC_IsDevValid.argtypes = (ctypes.POINTER(HGRABBER),)
+    ic.IC_OpenDevByUniqueName.argtypes = (ctypes.POINTER(HGRABBER), ctypes.c_char_p)
+    ic.IC_LoadDeviceStateFromFileEx.argtypes = (ctypes.POINTER(HGRABBER), ctypes.c_char_p, ctypes.c_int)
+    ic.IC_SaveDeviceStateToFile.argtypes = (ctypes.POINTER(HGRABBER), ctypes.c_char_p)
+    ic.IC_SetContinuousMode.argtypes = (ctypes.POINTER(HGRABBER), ctypes.c_int)
+    ic.IC_GetImagePtr.argtypes = (ctypes.POINTER(HGRABBER),)
+    ic.IC_AddFrameFilterToDevice.argtypes = (ctypes.POINTER(HGRABBER), HFRAMEFILTER)
+    ic.IC_FrameFilterSetParameterBoolean.argtypes = (HFRAMEFILTER, ctypes.c_char_p, ctypes.c_int)
+    ic.IC_printItemandElementNames.argtypes = (ctypes.POINTER(HGRABBER),)
+
+    # restype=None for void functions so ctypes does not box a meaningless
+    # return value into a Python int; precise c_int elsewhere
+    ic.IC_StopLive.restype = None
+    ic.IC_ReleaseGrabber.restype = None
+    ic.IC_CloseVideoCaptureDevice.restype = None
+    ic.IC_InitLibrary.restype = ctypes.c_int
+    ic.IC_IsDevValid.restype = ctypes.c_int
+    ic.IC_GetDeviceCount.restype = ctypes.c_int
+    ic.IC_OpenDevByUniqueName.restype = ctypes.c_int
+    ic.IC_LoadDeviceStateFromFileEx.restype = ctypes.c_int
+    ic.IC_SaveDeviceStateToFile.restype = ctypes.c_int
+    ic.IC_SetContinuousMode.restype = ctypes.c_int
+    ic.IC_printItemandElementNames.restype = ctypes.c_int
+
 
 def T(instr):
     ''' Helper function
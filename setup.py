@@ -1,10 +1,18 @@
 from setuptools import setup, find_packages
 
+# Cythonがある環境でだけ_ic_fast拡張をビルドする（無くてもctypes経路で動く）
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(["ic_camera_control/_ic_fast.pyx"])
+except ImportError:
+    ext_modules = []
+
 setup(
     name='ic_camera_control',
     version='0.1.0',
     packages=find_packages(),
+    ext_modules=ext_modules,
     data_files=[("./Lib/site-packages/ic_camera_control", ["./ic_camera_control/TIS_UDSHL11_x64.dll"]),
                 ("./Lib/site-packages/ic_camera_control", ["./ic_camera_control/tisgrabber_x64.dll"])],
     include_package_data=True
-)
\ No newline at end of file
+)